@@ -4,22 +4,40 @@ Coordinates all devices via MQTT without direct instantiation
 Implements state machine pattern with proper error handling
 """
 
-import json
+import collections
+import orjson
+import os
+import sys
 import time
 import uuid
 from enum import Enum
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+from functools import partial
 import paho.mqtt.client as mqtt
+from paho.mqtt.properties import Properties
+from paho.mqtt.packettypes import PacketTypes
 import logging
+import queue
+import socket
 import threading
 
 from PartDB import PartDatabase
 
-logging.basicConfig(level=logging.DEBUG)
+# Set WORKFLOW_DEBUG=1 for debug logging and [Debug] prints
+_DEBUG = bool(os.environ.get("WORKFLOW_DEBUG"))
+
+logging.basicConfig(level=logging.DEBUG if _DEBUG else logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fixed topic tokens, interned so routing compares mostly by identity
+_WORKFLOW = sys.intern("workflow")
+_CMD = sys.intern("cmd")
+_DATA = sys.intern("data")
+_STATUS = sys.intern("status")
+_ERROR = sys.intern("error")
+
 
 # ==========================================
 # STATE MACHINE
@@ -91,6 +109,19 @@ class WorkflowOrchestrator:
         WorkflowState.ERROR: 0.0,               # No delay for error
     }
 
+    # Completed jobs kept in memory (full record goes out on factory/workflow/job_complete)
+    JOB_HISTORY_SIZE = 1024
+
+    # Max entries per lookup cache
+    DB_CACHE_SIZE = 10_000
+
+    # State -> key in self.timeouts (states without a timeout are absent)
+    TIMEOUT_KEYS = {
+        WorkflowState.JOB_ALLOCATION: "qr_scan",
+        WorkflowState.WAITING_RFID: "rfid_read",
+        WorkflowState.WAITING_WEIGHT: "weight_stable",
+    }
+
     def __init__(
         self,
         broker: str = "localhost",
@@ -104,10 +135,14 @@ class WorkflowOrchestrator:
         self.part_db = PartDatabase(**db_config["part_db"]) if db_config else None
         self.bin_db = PartDatabase(**db_config["bin_db"]) if db_config else None
         
+        # In-process caches of successful DB lookups (part number / EPC -> row)
+        self._part_cache: Dict[str, Dict[str, Any]] = {}
+        self._bin_cache: Dict[str, Dict[str, Any]] = {}
+        
         # State management
         self.state = WorkflowState.IDLE
         self.current_job: Optional[JobContext] = None
-        self.job_history: list = []
+        self.job_history: collections.deque = collections.deque(maxlen=self.JOB_HISTORY_SIZE)
         
         # Device tracking
         self.devices = {
@@ -116,6 +151,7 @@ class WorkflowOrchestrator:
             "scale": None,
             "printer": None
         }
+        self._refresh_device_cache()
         
         # Timeout management
         self.timeouts = {
@@ -124,12 +160,26 @@ class WorkflowOrchestrator:
             "weight_stable": 15.0 # 15 Seconds
         }
         self.timeout_timer: Optional[float] = None
+        self._wake = threading.Event()  # Set whenever the timeout deadline changes
         
-        # MQTT
-        self.client = mqtt.Client(client_id="workflow_orchestrator")
+        # MQTT (v5, persistent session - see start())
+        self.client = mqtt.Client(client_id="workflow_orchestrator", protocol=mqtt.MQTTv5, transport="tcp")
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
+        self.client.max_inflight_messages_set(200)  # Don't serialize command bursts
+        self.client.max_queued_messages_set(0)      # 0 = unlimited queue
         self.connected = False
+        self._connected_event = threading.Event()
+        
+        # Topic / payload caches
+        self._status_topic = "factory/workflow/status"
+        self._topic_cache: Dict[Tuple[str, str, str], str] = {}
+        self._empty_cmd_payloads: Dict[Optional[str], bytes] = {}
+        
+        # Inbound events are handled on a worker thread so the paho loop never blocks
+        self._events: queue.Queue = queue.Queue(maxsize=10_000)
+        self._dropped_events = 0
+        self._worker: Optional[threading.Thread] = None
 
         # Track state entry time
         self.state_entry_time: Optional[float] = None
@@ -137,14 +187,33 @@ class WorkflowOrchestrator:
         self.transition_timer: Optional[threading.Timer] = None
         self._transition_lock = threading.RLock()
 
+        # State entry actions (ERROR has none)
+        self._entry_actions = {
+            WorkflowState.JOB_ALLOCATION: self._enter_job_allocation,
+            WorkflowState.WAITING_RFID: self._enter_waiting_rfid,
+            WorkflowState.WAITING_WEIGHT: self._enter_waiting_weight,
+            WorkflowState.VERIFICATION: self._enter_verification,
+            WorkflowState.JOB_CLOSEOUT: self._enter_job_closeout,
+            WorkflowState.DISPATCH: self._enter_dispatch,
+            WorkflowState.IDLE: self._enter_idle,
+        }
+
         # Transition to idle
         self._transition_to(WorkflowState.IDLE)
         
-    def _on_connect(self, client, userdata, flags, rc):
+    def _on_connect(self, client, userdata, flags, rc, properties=None):
         """MQTT connection callback"""
         if rc == 0:
             logger.info("Workflow Orchestrator connected to MQTT")
             self.connected = True
+            self._connected_event.set()
+            
+            # Disable Nagle so small command/status packets go out immediately
+            sock = self.client.socket()
+            if sock:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 256 * 1024)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 256 * 1024)
             
             # Subscribe to all device data topics
             self.client.subscribe("factory/+/+/data")
@@ -157,35 +226,57 @@ class WorkflowOrchestrator:
             logger.error(f"MQTT connection failed: {rc}")
             
     def _on_message(self, client, userdata, msg):
-        """Route incoming messages to appropriate handlers"""
+        """Parse incoming messages and queue them for the worker thread"""
         try:
-            topic_parts = msg.topic.split("/")
-            payload = json.loads(msg.payload.decode())
-            
-            if len(topic_parts) < 3:
+            # Parse topic: factory/{device_type}/{device_id}/{msg_type}
+            parts = msg.topic.split("/", 3)
+            if len(parts) < 3:
                 return
             
-            # Parse topic: factory/{device_type}/{device_id}/{msg_type}
-            device_type = topic_parts[1]
-            device_id = topic_parts[2]
-            msg_type = topic_parts[3] if len(topic_parts) > 3 else None
+            raw = msg.payload
+            payload = orjson.loads(raw) if raw else {}
             
-            # Handle workflow commands
-            if device_type == "workflow" and device_id == "cmd":
-                self._handle_workflow_command(msg_type, payload)
-                return
+            device_type, device_id = parts[1], parts[2]
+            msg_type = parts[3] if len(parts) > 3 else None
             
-            # Handle device messages
-            if msg_type == "data":
-                self._handle_device_data(device_type, device_id, payload)
-            elif msg_type == "status":
-                self._handle_device_status(device_type, device_id, payload)
-            elif msg_type == "error":
-                self._handle_device_error(device_type, device_id, payload)
-                
         except Exception as e:
             logger.error(f"Error processing message: {e}")
             self._publish_error(f"Message handler error: {e}")
+            return
+        
+        try:
+            self._events.put_nowait((device_type, device_id, msg_type, payload))
+        except queue.Full:
+            # Never block the network loop - drop and count instead
+            self._dropped_events += 1
+            logger.warning(f"Event queue full, dropped message on {msg.topic} ({self._dropped_events} dropped)")
+    
+    def _drain(self):
+        """Worker thread: route queued messages to the appropriate handlers"""
+        while True:
+            event = self._events.get()
+            if event is None:
+                break
+            try:
+                self._dispatch(*event)
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+                self._publish_error(f"Message handler error: {e}")
+    
+    def _dispatch(self, device_type: str, device_id: str, msg_type: Optional[str], payload: Dict):
+        """Route a parsed message to the appropriate handler"""
+        # Handle workflow commands
+        if device_type == _WORKFLOW and device_id == _CMD:
+            self._handle_workflow_command(msg_type, payload)
+            return
+        
+        # Handle device messages
+        if msg_type == _DATA:
+            self._handle_device_data(device_type, device_id, payload)
+        elif msg_type == _STATUS:
+            self._handle_device_status(device_type, device_id, payload)
+        elif msg_type == _ERROR:
+            self._handle_device_error(device_type, device_id, payload)
     
     def _handle_workflow_command(self, command: str, payload: Dict):
         """Handle workflow control commands"""
@@ -197,15 +288,35 @@ class WorkflowOrchestrator:
             self._publish_status(self.state)
         elif command == "set_devices":
             # Allow dynamic device ID configuration
-            self.devices.update(payload.get("devices", {}))
-            logger.info(f"Updated devices: {self.devices}")
+            self.set_devices(payload.get("devices", {}))
+        elif command == "invalidate_cache":
+            # Pick up part/bin changes made in the database
+            self._part_cache.clear()
+            self._bin_cache.clear()
+            logger.info("Part and bin lookup caches cleared")
+    
+    def set_devices(self, devices: Dict[str, Optional[str]]):
+        """Update device IDs and refresh the cached lookups"""
+        self.devices.update(devices)
+        self._refresh_device_cache()
+        logger.info(f"Updated devices: {self.devices}")
+    
+    def _refresh_device_cache(self):
+        """Resolve device IDs (with defaults) once instead of per state entry"""
+        self._device_qr = sys.intern(self.devices.get("qr_scanner") or "qr_scanner_01")
+        self._device_rfid = sys.intern(self.devices.get("rfid_reader") or "192.168.1.102")
+        self._device_scale = sys.intern(self.devices.get("scale") or "scale_01")
     
     def _handle_device_data(self, device_type: str, device_id: str, payload: Dict):
         """Handle data from devices based on current state"""
-        print(f"[_handle_device_data] payload: {payload}")
+        if _DEBUG:
+            print(f"[_handle_device_data] payload: {payload}")
         
         correlation_id = payload.get("correlation_id")
-        if self.current_job and correlation_id != self.current_job.correlation_id:
+        if isinstance(correlation_id, str):
+            correlation_id = sys.intern(correlation_id)
+        # Both sides are interned, so identity is equality
+        if self.current_job and correlation_id is not self.current_job.correlation_id:
             logger.warning(f"Ignoring message with wrong correlation_id: {correlation_id}")
             return
         
@@ -241,8 +352,8 @@ class WorkflowOrchestrator:
             return
         
         # Create new job context
-        job_id = f"JOB_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        correlation_id = str(uuid.uuid4())
+        job_id = f"JOB_{time.time_ns():016x}_{uuid.uuid4().hex[:8]}"
+        correlation_id = sys.intern(uuid.uuid4().hex)
         
         self.current_job = JobContext(
             job_id=job_id,
@@ -257,36 +368,36 @@ class WorkflowOrchestrator:
     
     def _transition_to(self, new_state: WorkflowState):
         """Transition to new state with minimum wait time"""
-        logger.debug(f"[TRANSITION] _transition_to called: {self.state} -> {new_state}")
+        logger.debug("[TRANSITION] _transition_to called: %s -> %s", self.state, new_state)
         
         # ===== Thread-safe transition handling =====
         with self._transition_lock:
-            logger.debug(f"[TRANSITION] Lock acquired for transition to {new_state}")
+            logger.debug("[TRANSITION] Lock acquired for transition to %s", new_state)
             
             # Cancel any pending transition
             if self.transition_timer:
-                logger.debug(f"[TRANSITION] Canceling pending transition to {self.pending_transition}")
+                logger.debug("[TRANSITION] Canceling pending transition to %s", self.pending_transition)
                 self.transition_timer.cancel()
                 self.transition_timer = None
             
             old_state = self.state
-            logger.debug(f"[TRANSITION] Current state: {old_state}, Target state: {new_state}")
+            logger.debug("[TRANSITION] Current state: %s, Target state: %s", old_state, new_state)
             
             # ===== Calculate time spent in current state =====
             time_in_state = 0.0
             if self.state_entry_time is not None:
                 time_in_state = time.time() - self.state_entry_time
-                logger.debug(f"[TRANSITION] Time in {old_state}: {time_in_state:.3f}s (entered at {self.state_entry_time:.3f})")
+                logger.debug("[TRANSITION] Time in %s: %.3fs (entered at %.3f)", old_state, time_in_state, self.state_entry_time)
             else:
-                logger.debug(f"[TRANSITION] No entry time recorded for {old_state}")
+                logger.debug("[TRANSITION] No entry time recorded for %s", old_state)
             
             # ===== Get minimum duration for current state =====
-            min_duration = self.MIN_STATE_DURATION.get(old_state, 0.0)
-            logger.debug(f"[TRANSITION] Minimum duration for {old_state}: {min_duration:.2f}s")
+            min_duration = self.MIN_STATE_DURATION[old_state]
+            logger.debug("[TRANSITION] Minimum duration for %s: %.2fs", old_state, min_duration)
             
             # ===== Calculate remaining time needed =====
             remaining_time = max(0.0, min_duration - time_in_state)
-            logger.debug(f"[TRANSITION] Remaining time needed: {remaining_time:.3f}s")
+            logger.debug("[TRANSITION] Remaining time needed: %.3fs", remaining_time)
             
             # ===== Delay transition if minimum duration not met =====
             if remaining_time > 0:
@@ -295,76 +406,61 @@ class WorkflowOrchestrator:
                     f"by {remaining_time:.2f}s (spent {time_in_state:.2f}s, "
                     f"min {min_duration:.2f}s)"
                 )
-                logger.debug(f"[TRANSITION] Setting up timer for {remaining_time:.3f}s delay")
+                logger.debug("[TRANSITION] Setting up timer for %.3fs delay", remaining_time)
                 
                 self.pending_transition = new_state
                 self.transition_timer = threading.Timer(
                     remaining_time,
-                    lambda: self._execute_transition(new_state)
+                    partial(self._execute_transition, new_state)
                 )
                 self.transition_timer.start()
-                logger.debug(f"[TRANSITION] Timer started for delayed transition to {new_state}")
+                logger.debug("[TRANSITION] Timer started for delayed transition to %s", new_state)
             else:
-                logger.debug(f"[TRANSITION] Minimum duration met ({time_in_state:.2f}s >= {min_duration:.2f}s), executing immediately")
+                logger.debug("[TRANSITION] Minimum duration met (%.2fs >= %.2fs), executing immediately", time_in_state, min_duration)
                 # Execute transition immediately if minimum time met
-                self._execute_transition(new_state)
+                self._execute_transition_locked(new_state)
 
     # ===== Separated execution logic =====
     def _execute_transition(self, new_state: WorkflowState):
-        """Execute the actual state transition"""
-        logger.debug(f"[EXECUTE] _execute_transition called for {new_state}")
+        """Execute the actual state transition (acquires the transition lock)"""
+        logger.debug("[EXECUTE] _execute_transition called for %s", new_state)
         
         with self._transition_lock:
-            logger.debug(f"[EXECUTE] Lock acquired for executing transition to {new_state}")
-            
-            old_state = self.state
-            self.state = new_state
-            
-            # ===== Record entry time for this state =====
-            self.state_entry_time = time.time()
-            logger.debug(f"[EXECUTE] State entry time recorded: {self.state_entry_time:.3f}")
-            
-            # Clear pending transition
-            was_pending = self.pending_transition
-            self.pending_transition = None
-            if was_pending:
-                logger.debug(f"[EXECUTE] Cleared pending transition: {was_pending}")
-            
-            logger.info(f"✅ State transition executed: {old_state.value} -> {new_state.value}")
-            
-            # Start timeout timer
-            logger.debug(f"[EXECUTE] Starting timeout timer for {new_state}")
-            self._start_timeout()
-            
-            # Publish state change
-            logger.debug(f"[EXECUTE] Publishing status for {new_state}")
-            self._publish_status(new_state)
-            
-            # Trigger state entry actions (same as before)
-            logger.debug(f"[EXECUTE] Triggering entry action for {new_state}")
-            if new_state == WorkflowState.JOB_ALLOCATION:
-                logger.debug(f"[EXECUTE] Calling _enter_job_allocation()")
-                self._enter_job_allocation()
-            elif new_state == WorkflowState.WAITING_RFID:
-                logger.debug(f"[EXECUTE] Calling _enter_waiting_rfid()")
-                self._enter_waiting_rfid()
-            elif new_state == WorkflowState.WAITING_WEIGHT:
-                logger.debug(f"[EXECUTE] Calling _enter_waiting_weight()")
-                self._enter_waiting_weight()
-            elif new_state == WorkflowState.VERIFICATION:
-                logger.debug(f"[EXECUTE] Calling _enter_verification()")
-                self._enter_verification()
-            elif new_state == WorkflowState.JOB_CLOSEOUT:
-                logger.debug(f"[EXECUTE] Calling _enter_job_closeout()")
-                self._enter_job_closeout()
-            elif new_state == WorkflowState.DISPATCH:
-                logger.debug(f"[EXECUTE] Calling _enter_dispatch()")
-                self._enter_dispatch()
-            elif new_state == WorkflowState.IDLE:
-                logger.debug(f"[EXECUTE] Calling _enter_idle()")
-                self._enter_idle()
-            
-            logger.debug(f"[EXECUTE] Transition to {new_state} complete")
+            self._execute_transition_locked(new_state)
+
+    def _execute_transition_locked(self, new_state: WorkflowState):
+        """Execute the actual state transition - caller must hold _transition_lock"""
+        old_state = self.state
+        self.state = new_state
+        
+        # ===== Record entry time for this state =====
+        self.state_entry_time = time.time()
+        logger.debug("[EXECUTE] State entry time recorded: %.3f", self.state_entry_time)
+        
+        # Clear pending transition
+        was_pending = self.pending_transition
+        self.pending_transition = None
+        if was_pending:
+            logger.debug("[EXECUTE] Cleared pending transition: %s", was_pending)
+        
+        logger.info(f"✅ State transition executed: {old_state.value} -> {new_state.value}")
+        
+        # Start timeout timer
+        logger.debug("[EXECUTE] Starting timeout timer for %s", new_state)
+        self._start_timeout()
+        
+        # Publish state change
+        logger.debug("[EXECUTE] Publishing status for %s", new_state)
+        self._publish_status(new_state)
+        
+        # Trigger state entry actions
+        logger.debug("[EXECUTE] Triggering entry action for %s", new_state)
+        entry_action = self._entry_actions.get(new_state)
+        if entry_action:
+            logger.debug("[EXECUTE] Calling %s()", entry_action.__name__)
+            entry_action()
+        
+        logger.debug("[EXECUTE] Transition to %s complete", new_state)
 
     # ===== Force transition method for emergencies =====
     def force_transition(self, new_state: WorkflowState):
@@ -372,17 +468,17 @@ class WorkflowOrchestrator:
         logger.warning(f"⚠️ FORCE TRANSITION requested: {self.state.value} -> {new_state.value}")
         
         with self._transition_lock:
-            logger.debug(f"[FORCE] Lock acquired for force transition to {new_state}")
+            logger.debug("[FORCE] Lock acquired for force transition to %s", new_state)
             
             if self.transition_timer:
-                logger.debug(f"[FORCE] Canceling pending timer for {self.pending_transition}")
+                logger.debug("[FORCE] Canceling pending timer for %s", self.pending_transition)
                 self.transition_timer.cancel()
                 self.transition_timer = None
             else:
-                logger.debug(f"[FORCE] No pending timer to cancel")
+                logger.debug("[FORCE] No pending timer to cancel")
             
-            logger.debug(f"[FORCE] Executing immediate transition to {new_state}")
-            self._execute_transition(new_state)
+            logger.debug("[FORCE] Executing immediate transition to %s", new_state)
+            self._execute_transition_locked(new_state)
             logger.info(f"✅ Force transition complete: -> {new_state.value}")
 
     # ===== Cleanup method =====
@@ -391,39 +487,50 @@ class WorkflowOrchestrator:
         logger.info(f"🧹 Cleanup called - current state: {self.state.value}")
         
         with self._transition_lock:
-            logger.debug(f"[CLEANUP] Lock acquired")
+            logger.debug("[CLEANUP] Lock acquired")
             
             if self.transition_timer:
                 logger.info(f"[CLEANUP] Canceling pending transition to {self.pending_transition}")
                 self.transition_timer.cancel()
                 self.transition_timer = None
-                logger.debug(f"[CLEANUP] Timer canceled and cleared")
+                logger.debug("[CLEANUP] Timer canceled and cleared")
             else:
-                logger.debug(f"[CLEANUP] No pending timer to cancel")
+                logger.debug("[CLEANUP] No pending timer to cancel")
             
             logger.info(f"✅ Cleanup complete")
     
     def _enter_job_allocation(self):
         """Start QR code scanning for job allocation"""
-        qr_device = self.devices.get("qr_scanner", "qr_scanner_01")
+        qr_device = self._device_qr
         
         # Command QR scanner to start
         self._send_device_command("qr", qr_device, "start_scan")
         
         logger.info("Waiting for QR code scan...")
     
+    def _cached_lookup(self, cache: Dict[str, Dict[str, Any]], key: str, fetch) -> Optional[Dict[str, Any]]:
+        """Return fetch(key), caching hits only so misses and DB errors are retried"""
+        row = cache.get(key)
+        if row is None:
+            row = fetch(key)
+            if row is not None:
+                if len(cache) >= self.DB_CACHE_SIZE:
+                    cache.pop(next(iter(cache)))  # Evict oldest entry
+                cache[key] = row
+        return row
+    
     def _handle_qr_scan(self, payload: Dict):
         """Process QR code scan result"""
         qr_code = payload.get("qr_code")
         logger.info(f"QR code scanned: {qr_code}")
         
         # Stop QR scanner
-        qr_device = self.devices.get("qr_scanner", "qr_scanner_01")
+        qr_device = self._device_qr
         self._send_device_command("qr", qr_device, "stop_scan")
         
         # Lookup part details in database
         if self.part_db:
-            part_details = self.part_db.get_part_details(qr_code)
+            part_details = self._cached_lookup(self._part_cache, qr_code, self.part_db.get_part_details)
             if part_details:
                 self.current_job.part_number = qr_code
                 self.current_job.part_details = part_details
@@ -452,7 +559,7 @@ class WorkflowOrchestrator:
     
     def _enter_waiting_rfid(self):
         """Start RFID polling for bin identification"""
-        rfid_device = self.devices.get("rfid_reader", "192.168.1.102")
+        rfid_device = self._device_rfid
         
         # Command RFID reader to start polling
         self._send_device_command("rfid", rfid_device, "start_polling")
@@ -472,13 +579,16 @@ class WorkflowOrchestrator:
         
         # Lookup empty bin weight
         if self.bin_db:
-            bin_data = self.bin_db.get_row(key_value=epc, key_column="epc")
+            bin_data = self._cached_lookup(
+                self._bin_cache, epc,
+                lambda key: self.bin_db.get_row(key_value=key, key_column="epc")
+            )
             if bin_data:
                 self.current_job.empty_bin_weight = bin_data.get("empty_bin_weight", 0)
                 logger.info(f"Empty bin weight: {self.current_job.empty_bin_weight:.3f} kg")
         
         # Stop RFID polling
-        rfid_device = self.devices.get("rfid_reader", "192.168.1.102")
+        rfid_device = self._device_rfid
         self._send_device_command("rfid", rfid_device, "stop_polling")
         
         # Move to weight measurement
@@ -486,7 +596,7 @@ class WorkflowOrchestrator:
     
     def _enter_waiting_weight(self):
         """Start scale monitoring for stable weight"""
-        scale_device = self.devices.get("scale", "scale_01")
+        scale_device = self._device_scale
         
         # Set tare if we have empty bin weight
         if self.current_job.empty_bin_weight:
@@ -501,23 +611,24 @@ class WorkflowOrchestrator:
     
     def _handle_weight_reading(self, payload: Dict):
         """Process weight reading from scale"""
-        stable = payload.get("stable", False)
-        weight = payload.get("weight")
-        net_weight = payload.get("net_weight")
+        # Every state only acts on stable readings - most readings are unstable
+        if not payload.get("stable", False):
+            return  # Wait for stable weight
+        
+        # The scale service always sends both fields
+        weight = payload["weight"]
+        net_weight = payload["net_weight"]
         
         # ← Handle different states
         if self.state == WorkflowState.WAITING_WEIGHT:
             # Original behavior - waiting for loaded bin
-            if not stable:
-                return  # Wait for stable weight
-            
             logger.info(f"Stable weight: {weight:.3f} kg (net: {net_weight:.3f} kg)")
             
             self.current_job.gross_weight = weight
             self.current_job.net_weight = net_weight
             
             # Stop scale monitoring
-            scale_device = self.devices.get("scale", "scale_01")
+            scale_device = self._device_scale
             self._send_device_command("scale", scale_device, "stop_monitoring")
             
             # Move to verification
@@ -526,45 +637,41 @@ class WorkflowOrchestrator:
         # Added for bin removal detection
         elif self.state == WorkflowState.JOB_CLOSEOUT:
             # waiting for bin removal
-            if not stable:
-                return  # Wait for stable weight
-            
             # Check if bin has been removed (weight dropped significantly)
             loaded_weight = self.current_job.loaded_bin_weight
             weight_threshold = loaded_weight * 0.3  # If weight < 30% of loaded weight
             
-            print(f"[Debug][_handle_weight_reading] Stable weight: {weight:.3f} kg (net: {net_weight:.3f} kg)")
-            print(f"[Debug][_handle_weight_reading] weight_threshold: {weight_threshold:.3f} kg")
+            if _DEBUG:
+                print(f"[Debug][_handle_weight_reading] Stable weight: {weight:.3f} kg (net: {net_weight:.3f} kg)")
+                print(f"[Debug][_handle_weight_reading] weight_threshold: {weight_threshold:.3f} kg")
             if weight < weight_threshold:
-                print(f"[Debug][_handle_weight_reading] Bin removed detected: {weight:.3f} kg (was {loaded_weight:.3f} kg)")
+                if _DEBUG:
+                    print(f"[Debug][_handle_weight_reading] Bin removed detected: {weight:.3f} kg (was {loaded_weight:.3f} kg)")
                 logger.info(f"Bin removed detected: {weight:.3f} kg (was {loaded_weight:.3f} kg)")
                 
                 # Stop scale monitoring
-                scale_device = self.devices.get("scale", "scale_01")
+                scale_device = self._device_scale
                 self._send_device_command("scale", scale_device, "stop_monitoring")
                 
                 # Now transition to dispatch
                 self._transition_to(WorkflowState.DISPATCH)
             else:
                 # Still waiting for removal
-                logger.debug(f"Bin still on scale: {weight:.3f} kg (waiting for removal)")
+                logger.debug("Bin still on scale: %.3f kg (waiting for removal)", weight)
         elif self.state == WorkflowState.IDLE:
-            if not stable:
-                return  # Wait for stable weight
-            
             # Check if a loaded bin is placed (weight > 1.25 kg)
             if weight >= 1.25:
                 logger.info(f"Loaded bin detected ({weight:.3f} kg) - auto-starting new job")
                 
                 # Stop scale monitoring (will restart in appropriate state)
-                scale_device = self.devices.get("scale", "scale_01")
+                scale_device = self._device_scale
                 self._send_device_command("scale", scale_device, "stop_monitoring")
                 
                 # Start new job automatically
                 self.start_new_job()
             else:
                 # Empty scale or light object
-                logger.debug(f"Scale weight: {weight:.3f} kg (waiting for loaded bin >= 1.25kg)")
+                logger.debug("Scale weight: %.3f kg (waiting for loaded bin >= 1.25kg)", weight)
 
     def _enter_verification(self):
         """Verify part count against target"""
@@ -621,7 +728,7 @@ class WorkflowOrchestrator:
         self.current_job.loaded_bin_weight = self.current_job.gross_weight
         
         # Start monitoring scale for bin removal
-        scale_device = self.devices.get("scale", "scale_01")
+        scale_device = self._device_scale
         self._send_device_command("scale", scale_device, "start_monitoring")
         
         # Update state - we'll wait in job_closeout for bin removal
@@ -638,7 +745,7 @@ class WorkflowOrchestrator:
                 "part_number": self.current_job.part_number,
                 "part_name": self.current_job.part_details.get("PART NAME") if self.current_job.part_details else "",
                 "count": self.current_job.actual_count,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now().isoformat(timespec="milliseconds")
             }
             self._send_device_command("printer", printer_device, "print_label", print_data)
         
@@ -659,7 +766,7 @@ class WorkflowOrchestrator:
         logger.info("Workflow idle")
         
         # Start monitoring scale for automatic job start
-        scale_device = self.devices.get("scale", "scale_01")
+        scale_device = self._device_scale
         self._send_device_command("scale", scale_device, "start_monitoring")
         logger.info("Monitoring scale - waiting for loaded bin (>1.25kg) to start new job...")
     
@@ -684,6 +791,7 @@ class WorkflowOrchestrator:
             self.current_job.errors.append(error_msg)
         
         self._publish_error(error_msg)
+        self._cancel_timeout()
         
         # Stop all devices
         self._stop_all_devices()
@@ -698,6 +806,7 @@ class WorkflowOrchestrator:
             return
         
         logger.warning("Job aborted by user")
+        self._cancel_timeout()
         self._stop_all_devices()
         self.current_job = None
         self._transition_to(WorkflowState.IDLE)
@@ -708,19 +817,26 @@ class WorkflowOrchestrator:
     
     def _start_timeout(self):
         """Start timeout timer for current state"""
-        timeout_map = {
-            WorkflowState.JOB_ALLOCATION: self.timeouts["qr_scan"],
-            WorkflowState.WAITING_RFID: self.timeouts["rfid_read"],
-            WorkflowState.WAITING_WEIGHT: self.timeouts["weight_stable"]
-        }
+        timeout_key = self.TIMEOUT_KEYS.get(self.state)
         # print(f"[Debug][_start_timeout] self.state: {self.state}")
-        timeout = timeout_map.get(self.state)
+        timeout = self.timeouts[timeout_key] if timeout_key else None
         if timeout:
             self.timeout_timer = time.time() + timeout
+            self._wake.set()
+        else:
+            # No timeout for this state - drop any deadline left over from the previous one
+            self.timeout_timer = None
     
     def _cancel_timeout(self):
         """Cancel timeout timer"""
         self.timeout_timer = None
+        self._wake.set()
+    
+    def _next_timeout_delta(self) -> Optional[float]:
+        """Seconds until the current timeout fires (None = no timeout pending)"""
+        if self.timeout_timer is None:
+            return None
+        return max(0.0, self.timeout_timer - time.time())
     
     def _check_timeout(self):
         """Check if current operation has timed out"""
@@ -731,64 +847,90 @@ class WorkflowOrchestrator:
     # MQTT HELPERS
     # ==========================================
     
+    def _topic_for(self, device_type: str, device_id: str, command: str) -> str:
+        """Return the (cached) command topic for a device"""
+        key = (device_type, device_id, command)
+        topic = self._topic_cache.get(key)
+        if topic is None:
+            topic = self._topic_cache.setdefault(key, f"factory/{device_type}/{device_id}/cmd/{command}")
+        return topic
+    
     def _send_device_command(self, device_type: str, device_id: str, command: str, params: Dict = None):
         """Send command to device via MQTT"""
-        topic = f"factory/{device_type}/{device_id}/cmd/{command}"
-        payload = params or {}
+        topic = self._topic_for(device_type, device_id, command)
+        correlation_id = self.current_job.correlation_id if self.current_job else None
         
-        # Add correlation ID
-        if self.current_job:
-            payload["correlation_id"] = self.current_job.correlation_id
+        if params:
+            # Add correlation ID
+            if correlation_id:
+                params["correlation_id"] = correlation_id
+            data = orjson.dumps(params)
+        else:
+            # Parameterless commands only differ by correlation ID - reuse the serialized payload
+            data = self._empty_cmd_payloads.get(correlation_id)
+            if data is None:
+                data = orjson.dumps({"correlation_id": correlation_id} if correlation_id else {})
+                self._empty_cmd_payloads = {correlation_id: data}
         
-        self.client.publish(topic, json.dumps(payload), qos=1)
+        self.client.publish(topic, data, qos=1)
         logger.info(f"Sent command: {topic}")
     
     def _stop_all_devices(self):
         """Stop all active devices"""
-        for device_type, device_id in self.devices.items():
-            if device_id:
-                stop_cmd = "stop_scan" if device_type == "qr_scanner" else "stop_monitoring" if device_type == "scale" else "stop_polling"
-                self._send_device_command(device_type.split("_")[0], device_id, stop_cmd)
+        # Every stop command carries the same payload - serialize it once
+        data = orjson.dumps({"correlation_id": self.current_job.correlation_id} if self.current_job else {})
+        
+        # Same resolved IDs (defaults included) the _enter_* actions started
+        for device_type, device_id, stop_cmd in (
+            ("qr", self._device_qr, "stop_scan"),
+            ("rfid", self._device_rfid, "stop_polling"),
+            ("scale", self._device_scale, "stop_monitoring"),
+        ):
+            topic = self._topic_for(device_type, device_id, stop_cmd)
+            # Stop commands are idempotent, no PUBACK needed
+            self.client.publish(topic, data, qos=0)
+            logger.info(f"Sent command: {topic}")
     
     def _publish_status(self, state: WorkflowState):
-        """Publish workflow status"""
+        """Publish workflow status (QoS 0, retained for late subscribers)"""
         payload = {
             "msg_type": "status",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
             "state": state.value,
             "job_id": self.current_job.job_id if self.current_job else None
         }
-        self.client.publish("factory/workflow/status", json.dumps(payload), qos=1)
+        self.client.publish(self._status_topic, orjson.dumps(payload), qos=0, retain=True)
     
     def _publish_task_ack(self, task: str, success: bool, data: Dict):
-        """Publish task acknowledgment"""
+        """Publish task acknowledgment (QoS 0 - monitoring only)"""
         payload = {
             "task": task,
             "success": success,
             "data": data,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
             "job_id": self.current_job.job_id if self.current_job else None
         }
-        print(f"[DEBUG][_publish_task_ack] topic: factory/workflow/ack/, payload: {payload}")
-        self.client.publish("factory/workflow/ack", json.dumps(payload), qos=1)
+        if _DEBUG:
+            print(f"[DEBUG][_publish_task_ack] topic: factory/workflow/ack/, payload: {payload}")
+        self.client.publish("factory/workflow/ack", orjson.dumps(payload), qos=0)
     
     def _publish_job_summary(self, job: JobContext):
-        """Publish completed job summary"""
-        payload = asdict(job)
-        payload["started_at"] = job.started_at.isoformat() if job.started_at else None
-        payload["completed_at"] = job.completed_at.isoformat() if job.completed_at else None
+        """Publish completed job summary (QoS 1 - the job record of truth)"""
+        # Shallow copy is enough for serializing - asdict() would deep-copy part_details/errors
+        payload = dict(vars(job))
+        # orjson serializes started_at/completed_at datetimes natively
         
-        self.client.publish("factory/workflow/job_complete", json.dumps(payload), qos=1)
+        self.client.publish("factory/workflow/job_complete", orjson.dumps(payload), qos=1)
     
     def _publish_error(self, error_msg: str):
-        """Publish error"""
+        """Publish error (QoS 0 - monitoring only)"""
         payload = {
             "msg_type": "error",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
             "error_msg": error_msg,
             "job_id": self.current_job.job_id if self.current_job else None
         }
-        self.client.publish("factory/workflow/error", json.dumps(payload), qos=1)
+        self.client.publish("factory/workflow/error", orjson.dumps(payload), qos=0)
     
     # ==========================================
     # LIFECYCLE
@@ -796,16 +938,19 @@ class WorkflowOrchestrator:
     
     def start(self):
         """Start orchestrator"""
-        self.client.connect(self.broker, self.port, 60)
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._drain, name="workflow_events", daemon=True)
+            self._worker.start()
+        
+        # MQTT v5 has no clean_session; keep the session across reconnects instead
+        connect_props = Properties(PacketTypes.CONNECT)
+        connect_props.ReceiveMaximum = 200
+        connect_props.SessionExpiryInterval = 3600  # 1 Hour
+        self.client.connect(self.broker, self.port, 60, clean_start=False, properties=connect_props)
         self.client.loop_start()
         
         # Wait for connection
-        timeout = 5
-        start = time.time()
-        while not self.connected and (time.time() - start) < timeout:
-            time.sleep(0.1)
-        
-        if not self.connected:
+        if not self._connected_event.wait(timeout=5):
             raise Exception("Failed to connect to MQTT broker")
         
         logger.info("Workflow Orchestrator started")
@@ -815,14 +960,21 @@ class WorkflowOrchestrator:
         self.abort_job()
         self.client.loop_stop()
         self.client.disconnect()
+        
+        if self._worker:
+            self._events.put(None)
+            self._worker.join(timeout=2)
+            self._worker = None
         logger.info("Workflow Orchestrator stopped")
     
     def run(self):
         """Run orchestrator main loop"""
         try:
             while True:
+                # Sleep until the pending timeout is due or the deadline changes
+                self._wake.wait(timeout=self._next_timeout_delta())
+                self._wake.clear()
                 self._check_timeout()
-                time.sleep(0.1)
         except KeyboardInterrupt:
             logger.info("Shutting down...")
             self.stop()
@@ -860,12 +1012,12 @@ if __name__ == "__main__":
     )
     
     # Configure device IDs
-    orchestrator.devices = {
+    orchestrator.set_devices({
         "qr_scanner": "qr_scanner_01",
         "rfid_reader": "192.168.1.102",
         "scale": "scale_01",
         "printer": None  # Optional
-    }
+    })
     
     orchestrator.start()
     orchestrator.run()
@@ -881,6 +1033,9 @@ python workflow_orchestrator.py
 # Abort job:
 mosquitto_pub -t factory/workflow/cmd/abort_job -m '{}'
 
+# Reload part/bin data after editing the database:
+mosquitto_pub -t factory/workflow/cmd/invalidate_cache -m '{}'
+
 # Monitor workflow:
 mosquitto_sub -t 'factory/workflow/#' -v
 """
\ No newline at end of file
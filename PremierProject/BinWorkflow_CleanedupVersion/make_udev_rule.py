@@ -44,21 +44,21 @@ def ensure_root():
 
 
 def list_ports():
+    """Scan serial ports once and print them; callers reuse the returned list."""
     ports = list(serial.tools.list_ports.comports())
     if not ports:
         print("No serial ports found on this host.")
         return ports
 
-    print("\nDetected serial devices:\n")
+    # Build the table and write it in one go
     header = f"{'idx':>3}  {'device':15}  {'vid:pid':11}  {'serial':15}  {'description'}"
-    print(header)
-    print("-" * len(header))
+    lines = ["\nDetected serial devices:\n", header, "-" * len(header)]
     for i, p in enumerate(ports):
         vidpid = f"{p.vid:04x}:{p.pid:04x}" if (p.vid and p.pid) else "-"
         serial_num = p.serial_number or "-"
         desc = p.description or "-"
-        print(f"{i:3}  {p.device:15}  {vidpid:11}  {serial_num:15}  {desc}")
-    print()
+        lines.append(f"{i:3}  {p.device:15}  {vidpid:11}  {serial_num:15}  {desc}")
+    print("\n".join(lines) + "\n")
     return ports
 
 
@@ -110,10 +110,13 @@ def write_rule_file(content: str, path: Path):
     path.chmod(0o644)
 
 def reload_udev():
-    print("Reloading udev rules...")
-    subprocess.run(["udevadm", "control", "--reload-rules"], check=True)
-    print("Triggering udev...")
-    subprocess.run(["udevadm", "trigger"], check=True)
+    # One process for reload + trigger; settle so the symlink exists when we return
+    print("Reloading and triggering udev...")
+    subprocess.run(
+        ["sh", "-c", "udevadm control --reload-rules && udevadm trigger && udevadm settle"],
+        check=True,
+        capture_output=True,
+    )
 
 
 def interactive_flow():
@@ -192,6 +195,8 @@ def interactive_flow():
         print("  sudo udevadm control --reload-rules")
         print("  sudo udevadm trigger")
         print("Error:", e)
+        if e.stderr:
+            print(e.stderr.decode(errors="replace").strip())
         sys.exit(1)
 
     print(f"\nDone. You should now see /dev/{symlink} (or it will be created when device is re-plugged).")
@@ -1,6 +1,7 @@
+import os
 import psycopg2
+from psycopg2.extras import execute_values
 import pandas as pd
-import math
 import numpy as np
 
 # -----------------------------
@@ -17,8 +18,6 @@ INPUT_CSV = "/home/santhosh/Projects/Test_Projects/Test1/PremierProject/PremierD
 # -----------------------------
 # LOAD CSV
 # -----------------------------
-df = pd.read_csv(INPUT_CSV)
-
 # Sanitize numeric columns
 numeric_cols = [
     "PART WEIGHT",
@@ -30,68 +29,47 @@ numeric_cols = [
 float_cols = ["PART WEIGHT"]
 int_cols = ["SL NO", "COVER QTY", "BIN QTY", "COVR QTY VARIATION"]
 
-# Sanitize floats
-def sanitize_numeric(value):
-    try:
-        f = float(value)
-        if math.isfinite(f):
-            return f
-        else:
-            return None
-    except:
-        return None
-
-for col in float_cols:
-    df[col] = df[col].apply(sanitize_numeric)
-
-# Sanitize integers
-def sanitize_integer(value):
-    try:
-        # If value is float nan, return None
-        if isinstance(value, float) and math.isnan(value):
-            return 0
-        val = int(float(value))  # handle float strings like "40.0"
-        if val < -9223372036854775808 or val > 9223372036854775807:
-            return 0
-        return val
-    except:
-        return 0
-
-for col in int_cols:
-    df[col] = df[col].apply(sanitize_integer)
+# Parse numbers in the C parser. Integer columns are read as float64 so blanks
+# can be NaN; sanitize_integer below converts them to int64.
+CSV_DTYPES = {col: "float64" for col in numeric_cols + int_cols}
+CSV_DTYPES.update({"PART NAME": str, "PART NUMBER": str, "MODEL": str})
+CSV_NA_VALUES = ["", " "]
 
-# Replace remaining NaN with None
-df = df.where(pd.notnull(df), None)
-# Replace numeric NaNs with None
-df = df.applymap(lambda x: None if (isinstance(x, float) and np.isnan(x)) else x)
+try:
+    df = pd.read_csv(INPUT_CSV, dtype=CSV_DTYPES, na_values=CSV_NA_VALUES)
+except ValueError as e:
+    # Non-numeric OCR junk in a numeric column - read untyped and let the sanitizers coerce it
+    print(f"Typed CSV read failed ({e}), falling back to untyped read")
+    df = pd.read_csv(INPUT_CSV, na_values=CSV_NA_VALUES)
 
-# Optional: also handle empty strings
-df = df.applymap(lambda x: None if isinstance(x, str) and x.strip() == "" else x)
+# Sanitize floats: non-numeric and inf -> NaN (becomes None below)
+def sanitize_numeric(col):
+    s = pd.to_numeric(col, errors="coerce")
+    return s.where(np.isfinite(s))
 
-# For printing only: convert all np.nan to None explicitly
-df_print = df.applymap(lambda x: None if (x is None or (isinstance(x, float) and np.isnan(x))) else x)
+for col in float_cols:
+    df[col] = sanitize_numeric(df[col])
 
-def to_none(x):
-    if isinstance(x, float) and math.isnan(x):  # np.nan
-        return None
-    if x is pd.NA:  # pandas NA
-        return None
-    if isinstance(x, str) and x.strip() == "":  # empty string
-        return None
-    return x
+# Sanitize integers: NaN, non-numeric and out-of-range -> 0, "40.0" -> 40
+def sanitize_integer(col):
+    s = pd.to_numeric(col, errors="coerce")
+    s = s.where((s >= -2**63) & (s < 2**63))  # int64 range
+    return np.trunc(s.fillna(0)).astype("int64")
 
-df = df.applymap(to_none)
+for col in int_cols:
+    df[col] = sanitize_integer(df[col])
 
-# Show all rows and columns when printing
-pd.set_option('display.max_rows', None)
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', 200)
-pd.set_option('display.max_colwidth', None)
+# Single cleanup pass: NaN / pd.NA / blank strings -> None
+null_mask = df.isna()
+str_cols = df.select_dtypes(include="object").columns
+null_mask[str_cols] |= df[str_cols].apply(lambda col: col.str.strip().eq(""))
+df = df.astype(object).where(~null_mask, None)
 
-# Example: df is your DataFrame
-print(df)
-# Example: df is your DataFrame
-print(df_print)
+# Preview the cleaned data (set DEBUG=1); rendering the full frame is slow for big CSVs
+if os.environ.get("DEBUG"):
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', 200)
+    print(df.head().to_string())
 
 # -----------------------------
 # INSERT INTO POSTGRES
@@ -105,35 +83,40 @@ conn = psycopg2.connect(
 )
 cur = conn.cursor()
 
-# Insert rows
-# for idx, row in df.iterrows():
-#     values = tuple(row[col] for col in df.columns)
-#     placeholders = ", ".join(["%s"] * len(df.columns))
-    
-#     # Quote column names to handle spaces/special characters
-#     quoted_columns = ", ".join([f'"{col}"' for col in df.columns])
-#     sql = f'INSERT INTO {TABLE_NAME} ({quoted_columns}) VALUES ({placeholders})'
-    
-#     try:
-#         cur.execute(sql, values)
-#         print(f"Inserted row {idx+1}")
-#     except Exception as e:
-#         print(f"Failed to insert row {idx+1}: {e}")
-for idx, row in df.iterrows():
-    values = tuple(row[col] for col in df.columns)
-    placeholders = ", ".join(["%s"] * len(df.columns))
-    quoted_columns = ", ".join([f'"{col}"' for col in df.columns])
-    sql = f'INSERT INTO {TABLE_NAME} ({quoted_columns}) VALUES ({placeholders})'
-    
-    try:
-        cur.execute(sql, values)
-        conn.commit()
-        print(f"Inserted row {idx+1}")
-    except Exception as e:
-        conn.rollback()
-        print(f"Failed to insert row {idx+1}: {e}")
-
-conn.commit()
+# Insert all rows in batched statements (one round-trip per page instead of per row)
+columns = list(df.columns)
+quoted_columns = ", ".join([f'"{col}"' for col in columns])
+sql = f'INSERT INTO {TABLE_NAME} ({quoted_columns}) VALUES %s'
+# df is already object dtype (cleanup above), so rows hold plain Python values
+rows = list(df.itertuples(index=False, name=None))
+
+try:
+    execute_values(cur, sql, rows, page_size=1000)
+    conn.commit()
+    print(f"Inserted {len(rows)} rows")
+except Exception as e:
+    conn.rollback()
+    print(f"Batch insert failed ({e}), retrying row by row")
+
+    # Isolate bad rows with a savepoint each, still committing once at the end
+    # Prepare the INSERT once server-side; each row only sends EXECUTE + values
+    params = ", ".join(f"${i+1}" for i in range(len(columns)))
+    cur.execute(f'PREPARE row_insert_stmt AS INSERT INTO {TABLE_NAME} ({quoted_columns}) VALUES ({params})')
+    placeholders = ", ".join(["%s"] * len(columns))
+    row_sql = f"EXECUTE row_insert_stmt ({placeholders})"
+    inserted = 0
+    for idx, values in enumerate(rows):
+        cur.execute("SAVEPOINT row_insert")
+        try:
+            cur.execute(row_sql, values)
+            cur.execute("RELEASE SAVEPOINT row_insert")
+            inserted += 1
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT row_insert")
+            print(f"Failed to insert row {idx+1}: {e}")
+    conn.commit()
+    print(f"Inserted {inserted}/{len(rows)} rows")
+
 cur.close()
 conn.close()
 print("✅ All rows processed")
@@ -1,6 +1,6 @@
 import pandas as pd
 from supabase import create_client, Client
-import math
+import numpy as np
 
 # -------------------------------
 # CONFIGURATION
@@ -33,33 +33,26 @@ numeric_cols = [
     "BIN WEIGHT",
     "COVR QTY VARIATION"]
 
+# Non-numeric / empty -> NaN, inf / -inf -> NaN
 for col in numeric_cols:
-    df[col] = pd.to_numeric(df[col], errors="coerce")  # converts empty strings to NaN
+    s = pd.to_numeric(df[col], errors="coerce")
+    df[col] = s.where(np.isfinite(s))
 
-def sanitize_numeric(value):
-    try:
-        f = float(value)
-        if math.isfinite(f):
-            return f
-        else:
-            return None  # replaces inf, -inf
-    except:
-        return None  # non-numeric → None
-
-for col in numeric_cols:
-    df[col] = df[col].apply(sanitize_numeric)
-
-df = df.where(pd.notnull(df), None)
+# NaN -> None (object dtype so the records hold plain Python values)
+df = df.astype(object).where(df.notna(), None)
 
 # -------------------------------
 # UPLOAD TO SUPABASE
 # -------------------------------
-for idx, row in df.iterrows():
-    data = row.to_dict()
+BATCH_SIZE = 500  # rows per insert request
+
+records = df.to_dict(orient="records")
+for start in range(0, len(records), BATCH_SIZE):
+    batch = records[start:start + BATCH_SIZE]
     try:
-        supabase.table(TABLE_NAME).insert(data).execute()
-        print(f"Inserted row {idx+1}")
+        supabase.table(TABLE_NAME).insert(batch).execute()
+        print(f"Inserted rows {start+1}-{start+len(batch)}")
     except Exception as e:
-        print(f"Failed to insert row {idx+1}: {e}")
+        print(f"Failed to insert rows {start+1}-{start+len(batch)}: {e}")
 
 print("\n✅ All rows processed")
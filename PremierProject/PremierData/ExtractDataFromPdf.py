@@ -6,6 +6,9 @@ import re
 # -------------------------------
 PDF_FILE = "/home/santhosh/Projects/Test_Projects/Test1/PremierProject/PremierData/BIN PART WEIGHT DETAILS (1).pdf"
 
+# Lines containing a part number (e.g. "603-K0L-00") are table rows
+PART_NUMBER_RE = re.compile(r"\d{3}-[A-Z0-9-]+")
+
 # -------------------------------
 # PDF PARSER
 # -------------------------------
@@ -19,13 +22,10 @@ def parse_pdf_table(pdf_path):
             if not text:
                 continue
 
-            lines = text.splitlines()
-            print(lines)
-
-            for line in lines:
+            for line in text.splitlines():
                 # Example line:
                 # "FR NUMBER PLATE 603-K0L-00 KOL 1.22 2.24 57 51 50 2.47"
-                if re.search(r"\d{3}-[A-Z0-9-]+", line):
+                if PART_NUMBER_RE.search(line):
                     tokens = line.split()
                     # print(f"Tokens: {tokens}")
 
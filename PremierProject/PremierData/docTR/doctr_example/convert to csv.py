@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 # -------------------------------
@@ -28,13 +29,11 @@ def txt_to_table(input_txt):
         # Keep empty cells as blank strings
         lines = [line.rstrip() for line in f]
 
-    rows = []
-    for i in range(0, len(lines), len(COLUMNS)):
-        chunk = lines[i:i+len(COLUMNS)]
-        if len(chunk) == len(COLUMNS):
-            rows.append(chunk)
+    # One row per len(COLUMNS) lines; a trailing partial row is dropped
+    arr = np.asarray(lines, dtype=object)
+    n_full = (len(arr) // len(COLUMNS)) * len(COLUMNS)
 
-    df = pd.DataFrame(rows, columns=COLUMNS)
+    df = pd.DataFrame(arr[:n_full].reshape(-1, len(COLUMNS)), columns=COLUMNS)
     return df
 
 
@@ -1,9 +1,65 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import torch
 from doctr.io import DocumentFile
+from doctr.io.elements import Document
 from doctr.models import ocr_predictor
 
-model = ocr_predictor(pretrained=True)
-# PDF
-doc = DocumentFile.from_pdf("/home/santhosh/Projects/Test_Projects/Test1/PremierProject/PremierData/BIN PART WEIGHT DETAILS (1).pdf")
-# Analyze
-result = model(doc)
-print(result)
\ No newline at end of file
+PDF_FILE = "/home/santhosh/Projects/Test_Projects/Test1/PremierProject/PremierData/BIN PART WEIGHT DETAILS (1).pdf"
+PAGE_BATCH = 16  # pages per forward pass
+
+
+@lru_cache(maxsize=1)
+def _get_model():
+    # One predictor per process
+    model = ocr_predictor(pretrained=True)
+    # Run on GPU in half precision when available
+    if torch.cuda.is_available():
+        model = model.cuda().half()
+    return model
+
+
+def _ocr_page_chunk(pages):
+    # Each worker owns a core - don't let torch spawn its own thread pool on top
+    torch.set_num_threads(1)
+    with torch.inference_mode():
+        return _get_model()(list(pages)).pages
+
+
+def ocr_pdf(pdf_path):
+    doc = DocumentFile.from_pdf(pdf_path)
+
+    if torch.cuda.is_available():
+        # GPU: batched pages, no autograd bookkeeping
+        model = _get_model()
+        pages = []
+        with torch.inference_mode():
+            for i in range(0, len(doc), PAGE_BATCH):
+                pages.extend(model(doc[i:i + PAGE_BATCH]).pages)
+        # Each batch numbers its pages from 0 - renumber across the whole PDF
+        for i, page in enumerate(pages):
+            page.page_idx = i
+        return Document(pages)
+
+    # CPU: pages are independent, OCR them in parallel across cores
+    workers = min(os.cpu_count() or 1, len(doc))
+    if workers <= 1:
+        with torch.inference_mode():
+            return _get_model()(doc)
+    chunks = [list(c) for c in np.array_split(np.arange(len(doc)), workers)]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        results = ex.map(_ocr_page_chunk, [[doc[i] for i in idx] for idx in chunks])
+        pages = [page for chunk_pages in results for page in chunk_pages]
+    # Each worker numbers its chunk from 0 - renumber across the whole PDF
+    for i, page in enumerate(pages):
+        page.page_idx = i
+    return Document(pages)
+
+
+if __name__ == "__main__":
+    # Analyze
+    result = ocr_pdf(PDF_FILE)
+    print(result)
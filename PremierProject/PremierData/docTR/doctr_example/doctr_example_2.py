@@ -1,4 +1,6 @@
 import os
+from functools import lru_cache
+import torch
 from doctr.io import DocumentFile
 from doctr.models import ocr_predictor
 
@@ -7,23 +9,39 @@ from doctr.models import ocr_predictor
 # -------------------------------
 PDF_FILE = "/home/santhosh/Projects/Test_Projects/Test1/PremierProject/PremierData/BIN PART WEIGHT DETAILS (1).pdf"
 
-# Load doctr model (detector + recognizer)
-model = ocr_predictor(pretrained=True)
 
-# Load PDF (doctr handles PDFs by converting pages into images internally)
-doc = DocumentFile.from_pdf(PDF_FILE)
+@lru_cache(maxsize=1)
+def _get_model():
+    # Load doctr model (detector + recognizer) once and reuse it for every PDF
+    model = ocr_predictor(pretrained=True)
+    # Run on GPU in half precision when available
+    if torch.cuda.is_available():
+        model = model.cuda().half()
+    return model
+
+
+def ocr_pdf(pdf_path, model=None):
+    model = model or _get_model()
+    # Load PDF (doctr handles PDFs by converting pages into images internally)
+    doc = DocumentFile.from_pdf(pdf_path)
+    # Run OCR on all pages in one batch, no autograd bookkeeping
+    with torch.inference_mode():
+        return model(doc)
 
-# Run OCR
-result = model(doc)
 
 # -------------------------------
 # PROCESS OUTPUT
 # -------------------------------
-# result.pages -> list of Page objects, each with blocks/lines/words
-for page_idx, page in enumerate(result.pages, start=1):
-    print(f"\n--- Page {page_idx} ---")
-    for block in page.blocks:
-        for line in block.lines:
-            # Each line has multiple words
-            line_text = " ".join([word.value for word in line.words])
-            print(line_text)
+def format_pages(result):
+    # result.pages -> list of Page objects, each with blocks/lines/words
+    for page_idx, page in enumerate(result.pages, start=1):
+        yield f"\n--- Page {page_idx} ---"
+        for block in page.blocks:
+            for line in block.lines:
+                # Each line has multiple words
+                yield " ".join(word.value for word in line.words)
+
+
+if __name__ == "__main__":
+    for text in format_pages(ocr_pdf(PDF_FILE)):
+        print(text)
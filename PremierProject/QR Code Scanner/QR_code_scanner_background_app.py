@@ -1,4 +1,7 @@
 # qr_scanner.py
+import os
+import selectors
+import sys
 import threading
 
 class QRScanner:
@@ -6,25 +9,48 @@ class QRScanner:
         self.callback = callback
         self._running = False
         self._thread = None
+        self._stopped = threading.Event()
 
     def _scan_qr(self):
         print("Scan a QR code (Ctrl+C to exit):")
-        while self._running:
-            try:
-                code = input().strip()
+        # Poll stdin so stop() is noticed within one timeout instead of
+        # waiting for the next scanned line. The fd is read directly: a buffered
+        # readline() could swallow several lines the selector no longer sees.
+        fd = sys.stdin.fileno()
+        encoding = sys.stdin.encoding or "utf-8"
+        sel = selectors.DefaultSelector()
+        sel.register(fd, selectors.EVENT_READ)
+        buf = b""
+        try:
+            while self._running:
+                idx = buf.find(b"\n")
+                if idx < 0:
+                    # No complete line buffered - wait for more input
+                    if not sel.select(timeout=0.1):
+                        continue
+                    chunk = os.read(fd, 4096)
+                    if chunk:
+                        buf += chunk
+                        continue
+                    # input stream closed - hand over a last unterminated line, like input()
+                    if not buf:
+                        break
+                    line, buf = buf, b""
+                else:
+                    line, buf = buf[:idx], buf[idx + 1:]
+                code = line.decode(encoding, errors="ignore").strip()
                 if code:
                     print(f"scanned code: {code}")
                     self.callback(code)
-            except EOFError:
-                # input stream closed
-                break
-            except KeyboardInterrupt:
-                print("\nScanner stopped by user.")
-                break
+        finally:
+            sel.close()
+            self._running = False
+            self._stopped.set()
 
     def start(self):
         if not self._running:
             self._running = True
+            self._stopped.clear()
             self._thread = threading.Thread(target=self._scan_qr, daemon=True)
             self._thread.start()
 
@@ -32,6 +58,7 @@ class QRScanner:
         """Stop the scanner thread gracefully."""
         if self._running:
             self._running = False
+            self._stopped.set()
             print("Stopping QR scanner...")
             # Only join if we are NOT in the scanner thread
             if threading.current_thread() != self._thread and self._thread:
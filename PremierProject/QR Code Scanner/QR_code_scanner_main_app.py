@@ -1,5 +1,4 @@
 from QR_code_scanner_background_app import QRScanner
-import time
 
 TARGET_CODE = "64303-K0L-D000"  # the QR code that should stop the scanner
 
@@ -14,9 +13,7 @@ scanner_obj.start()
 
 # Main loop can continue doing other work
 try:
-    while scanner_obj._running:
-        # print("Main program working...")
-        time.sleep(0.5)
+    scanner_obj._stopped.wait()
 finally:
     scanner_obj.stop()
     print("Exited cleanly.")
@@ -1,6 +1,37 @@
 # qrscanner.py
 
-from evdev import InputDevice, list_devices, categorize, ecodes
+import re
+
+from evdev import InputDevice, list_devices, ecodes
+
+# evdev key code -> character on a US layout, (unshifted, shifted), built once at import
+_KEY_CHARS = {
+    **{getattr(ecodes, f"KEY_{c.upper()}"): (c, c.upper()) for c in "abcdefghijklmnopqrstuvwxyz"},
+    **{getattr(ecodes, f"KEY_{d}"): (d, s) for d, s in zip("1234567890", "!@#$%^&*()")},
+    ecodes.KEY_MINUS: ("-", "_"),
+    ecodes.KEY_EQUAL: ("=", "+"),
+    ecodes.KEY_LEFTBRACE: ("[", "{"),
+    ecodes.KEY_RIGHTBRACE: ("]", "}"),
+    ecodes.KEY_BACKSLASH: ("\\", "|"),
+    ecodes.KEY_SEMICOLON: (";", ":"),
+    ecodes.KEY_APOSTROPHE: ("'", '"'),
+    ecodes.KEY_GRAVE: ("`", "~"),
+    ecodes.KEY_COMMA: (",", "<"),
+    ecodes.KEY_DOT: (".", ">"),
+    ecodes.KEY_SLASH: ("/", "?"),
+    ecodes.KEY_SPACE: (" ", " "),
+    ecodes.KEY_TAB: ("\t", "\t"),
+}
+_KEYCHAR = {code: chars[0] for code, chars in _KEY_CHARS.items()}
+_KEYCHAR_SHIFT = {code: chars[1] for code, chars in _KEY_CHARS.items()}
+_SHIFT_KEYS = frozenset((ecodes.KEY_LEFTSHIFT, ecodes.KEY_RIGHTSHIFT))
+_ENTER = ecodes.KEY_ENTER
+_EV_KEY = ecodes.EV_KEY
+
+# Kernel's input device table: one blank-line separated block per device
+_INPUT_DEVICES = "/proc/bus/input/devices"
+_NAME_RE = re.compile(r'^N: Name="(.*)"$', re.M)
+_EVENT_RE = re.compile(r"^H: Handlers=.*?\b(event\d+)", re.M)
 
 
 class QRScanner:
@@ -9,44 +40,97 @@ class QRScanner:
         self.device = self._find_scanner()
 
     def _find_scanner(self):
-        """Automatically find the scanner device by keyword."""
-        for path in list_devices():
-            dev = InputDevice(path)
-            if self.keyword.lower() in dev.name.lower():
-                return dev
+        """Automatically find the scanner device by keyword, opening only the match."""
+        keyword = self.keyword.lower()
+        try:
+            with open(_INPUT_DEVICES) as f:
+                blocks = f.read().split("\n\n")
+        except OSError:
+            # No /proc table - fall back to opening every device for its name
+            for path in list_devices():
+                dev = InputDevice(path)
+                if keyword in dev.name.lower():
+                    return dev
+            return None
+
+        for block in blocks:
+            name = _NAME_RE.search(block)
+            if name and keyword in name.group(1).lower():
+                event = _EVENT_RE.search(block)
+                if event:
+                    return InputDevice(f"/dev/input/{event.group(1)}")
         return None
 
+    def _feed(self, event):
+        """Consume one EV_KEY event; return the scanned QR code once ENTER completes it."""
+        key = event.code
+        if key in _SHIFT_KEYS:
+            self._shift = event.value != 0  # held (1/2) or released (0)
+            return None
+        if event.value != 1:  # only key down produces characters
+            return None
+        scanned = self._scanned
+        if key != _ENTER:
+            scanned.append((_KEYCHAR_SHIFT if self._shift else _KEYCHAR).get(key, ""))
+            return None
+        if not scanned:
+            return None
+        code = "".join(scanned)
+        scanned.clear()
+        return code
+
+    def _start_listening(self):
+        if not self.device:
+            print("Scanner not found!")
+            return False
+        print(f"Listening for QR codes on: {self.device.name} ({self.device.path})")
+        self._scanned = []
+        self._shift = False
+        return True
+
     def listen(self, callback=None):
         """
         Listen for QR code scans.
         - If callback is provided, call it with each scanned QR code.
         - Otherwise, print the scanned QR codes.
         """
-        if not self.device:
-            print("Scanner not found!")
+        if not self._start_listening():
             return
 
-        print(f"Listening for QR codes on: {self.device.name} ({self.device.path})")
-        scanned = ""
-
+        feed = self._feed
         try:
             for event in self.device.read_loop():
-                if event.type == ecodes.EV_KEY:
-                    data = categorize(event)
-                    if data.keystate == 1:  # key down
-                        key = data.keycode.replace("KEY_", "")
-                        if key == "ENTER":
-                            if scanned:
-                                if callback:
-                                    callback(scanned)
-                                else:
-                                    print("QR Code:", scanned)
-                                scanned = ""
-                        else:
-                            scanned += key
+                # EV_SYN/EV_MSC make up about half the stream - drop them before any work
+                if event.type != _EV_KEY:
+                    continue
+                code = feed(event)
+                if code:
+                    if callback:
+                        callback(code)
+                    else:
+                        print("QR Code:", code)
         except KeyboardInterrupt:
             print("\nExiting QR scanner...")
 
+    async def listen_async(self, callback=None):
+        """
+        listen() for an asyncio event loop, so the scanner can share one thread with
+        other devices (e.g. SerialScale.monitor_async) instead of blocking its own.
+        """
+        if not self._start_listening():
+            return
+
+        feed = self._feed
+        async for event in self.device.async_read_loop():
+            if event.type != _EV_KEY:
+                continue
+            code = feed(event)
+            if code:
+                if callback:
+                    callback(code)
+                else:
+                    print("QR Code:", code)
+
 
 def main():
     """CLI entrypoint for running the scanner directly."""
@@ -56,3 +140,10 @@ def main():
 
 if __name__ == "__main__":
     main()
+
+
+# Usage together with the weighing scale on one event loop
+# async def run(scanner, scale):
+#     await asyncio.gather(scanner.listen_async(on_scan), scale.monitor_async())
+#
+# asyncio.run(run(QRScanner(), SerialScale(port="/dev/ttyUSB0", stable_callback=on_stable)))
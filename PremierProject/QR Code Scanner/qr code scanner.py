@@ -1,4 +1,7 @@
-from evdev import InputDevice, categorize, ecodes, list_devices
+from evdev import InputDevice, ecodes, list_devices
+
+# evdev key code -> key name without the "KEY_" prefix, built once at import
+KEYMAP = {v: k[4:] for k, v in ecodes.ecodes.items() if k.startswith("KEY_") and len(k) > 4}
 
 # List all input devices
 devices = [InputDevice(path) for path in list_devices()]
@@ -8,16 +11,13 @@ for dev in devices:
 # Choose your scanner's device path (e.g. '/dev/input/event3')
 scanner = InputDevice('/dev/input/event3')
 
-scanned = ""
+scanned = []
 print("Waiting for QR code...")
 
 for event in scanner.read_loop():
-    if event.type == ecodes.EV_KEY:
-        data = categorize(event)
-        if data.keystate == 1:  # Key down
-            keycode = data.keycode.replace("KEY_", "")
-            if keycode == "ENTER":
-                print(f"QR Code: {scanned}")
-                scanned = ""
-            else:
-                scanned += keycode
+    if event.type == ecodes.EV_KEY and event.value == 1:  # Key down
+        if event.code == ecodes.KEY_ENTER:
+            print(f"QR Code: {''.join(scanned)}")
+            scanned.clear()
+        else:
+            scanned.append(KEYMAP.get(event.code, ""))
@@ -1,11 +1,20 @@
-from evdev import InputDevice, list_devices, categorize, ecodes
+import re
+from evdev import InputDevice, list_devices, ecodes
+
+# evdev key code -> key name without the "KEY_" prefix, built once at import
+KEYMAP = {v: k[4:] for k, v in ecodes.ecodes.items() if k.startswith("KEY_") and len(k) > 4}
 
 def find_scanner(keyword="barcode"):
     """Find input device containing the keyword in its name."""
-    devices = [InputDevice(path) for path in list_devices()]
-    for dev in devices:
-        if keyword.lower() in dev.name.lower():
-            return dev
+    # Match on the kernel's device table so only the scanner itself gets opened
+    with open("/proc/bus/input/devices") as f:
+        blocks = f.read().split("\n\n")
+    for block in blocks:
+        name = re.search(r'^N: Name="(.*)"$', block, re.M)
+        if name and keyword.lower() in name.group(1).lower():
+            event = re.search(r"^H: Handlers=.*?\b(event\d+)", block, re.M)
+            if event:
+                return InputDevice(f"/dev/input/{event.group(1)}")
     return None
 
 scanner = find_scanner("barcode")  # change "barcode" → part of your scanner name
@@ -18,15 +27,12 @@ if not scanner:
 print(f"Using scanner: {scanner.name} at {scanner.path}")
 print("Waiting for QR codes...")
 
-scanned = ""
+scanned = []
 for event in scanner.read_loop():
-    if event.type == ecodes.EV_KEY:
-        data = categorize(event)
-        if data.keystate == 1:  # Key down event
-            key = data.keycode.replace("KEY_", "")
-            if key == "ENTER":
-                if scanned:
-                    print(f"QR Code: {scanned}")
-                    scanned = ""
-            else:
-                scanned += key
+    if event.type == ecodes.EV_KEY and event.value == 1:  # Key down event
+        if event.code == ecodes.KEY_ENTER:
+            if scanned:
+                print(f"QR Code: {''.join(scanned)}")
+                scanned.clear()
+        else:
+            scanned.append(KEYMAP.get(event.code, ""))
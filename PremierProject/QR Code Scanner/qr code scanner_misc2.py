@@ -1,11 +1,20 @@
-from evdev import InputDevice, list_devices, categorize, ecodes
+import re
+from evdev import InputDevice, ecodes
+
+# evdev key code -> key name without the "KEY_" prefix, built once at import
+KEYMAP = {v: k[4:] for k, v in ecodes.ecodes.items() if k.startswith("KEY_") and len(k) > 4}
 
 def find_scanner(keyword="USBScn"):
     """Automatically find the Hangzhou/USBScn scanner device."""
-    for path in list_devices():
-        dev = InputDevice(path)
-        if keyword.lower() in dev.name.lower():
-            return dev
+    # Match on the kernel's device table so only the scanner itself gets opened
+    with open("/proc/bus/input/devices") as f:
+        blocks = f.read().split("\n\n")
+    for block in blocks:
+        name = re.search(r'^N: Name="(.*)"$', block, re.M)
+        if name and keyword.lower() in name.group(1).lower():
+            event = re.search(r"^H: Handlers=.*?\b(event\d+)", block, re.M)
+            if event:
+                return InputDevice(f"/dev/input/{event.group(1)}")
     return None
 
 scanner = find_scanner()
@@ -15,18 +24,15 @@ if not scanner:
 
 print(f"Listening for QR codes on: {scanner.name} ({scanner.path})")
 
-scanned = ""
+scanned = []
 try:
     for event in scanner.read_loop():
-        if event.type == ecodes.EV_KEY:
-            data = categorize(event)
-            if data.keystate == 1:  # key down
-                key = data.keycode.replace("KEY_", "")
-                if key == "ENTER":
-                    if scanned:
-                        print("QR Code:", scanned)
-                        scanned = ""
-                else:
-                    scanned += key
+        if event.type == ecodes.EV_KEY and event.value == 1:  # key down
+            if event.code == ecodes.KEY_ENTER:
+                if scanned:
+                    print("QR Code:", "".join(scanned))
+                    scanned.clear()
+            else:
+                scanned.append(KEYMAP.get(event.code, ""))
 except KeyboardInterrupt:
     print("\nExiting...")
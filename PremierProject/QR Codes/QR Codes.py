@@ -1,13 +1,22 @@
+import os
 import qrcode
-import random
 import string
 
+# Byte -> SKU character lookup for bytes.translate (alphabet repeated over all 256 byte values)
+_ALPHABET = (string.ascii_uppercase + string.digits).encode()
+_SKU_TABLE = (_ALPHABET * (256 // len(_ALPHABET) + 1))[:256]
+# Bytes past the last full repeat of the alphabet would favour its first characters - drop them
+_SKU_REJECT = bytes(range(256 - 256 % len(_ALPHABET), 256))
+
 def generate_sku(prefix="SKU", length=8):
     """
     Generate a SKU string.
     Example: SKU-4G7H9K2L
     """
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+    random_part = b""
+    while len(random_part) < length:
+        random_part += os.urandom(length).translate(_SKU_TABLE, _SKU_REJECT)
+    random_part = random_part[:length].decode()
     return f"{prefix}-{random_part}"
 
 # Generate a new SKU
@@ -28,6 +37,6 @@ img = qr.make_image(fill_color="black", back_color="white")
 
 # Save as file
 filename = f"{sku}.png"
-img.save(filename)
+img.save(filename, format="PNG", optimize=False, compress_level=1)
 
 print(f"QR code saved as {filename}")
@@ -17,6 +17,6 @@ qr.make(fit=True)
 img = qr.make_image(fill_color="black", back_color="white")
 
 # Save the QR code image
-img.save("BRACKET FR NUMBER PLATE.png")
+img.save("BRACKET FR NUMBER PLATE.png", format="PNG", optimize=False, compress_level=1)
 
 print("QR code saved as qrcode.png")
@@ -58,5 +58,5 @@ draw.text(((qr_img.width - part_w) // 2, extra_height - part_h - 5), part_number
 # ----------------------
 # Save final image
 # ----------------------
-new_img.save("LID USB CHARGER.png")
+new_img.save("LID USB CHARGER.png", format="PNG", optimize=False, compress_level=1)
 print("QR code saved as qrcode_with_text.png")
@@ -1,13 +1,46 @@
 # qrcode_generator.py
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import qrcode
 from PIL import Image, ImageDraw, ImageFont
 
+# zlib level 1: QR labels are flat images, higher levels cost time for almost no size
+PNG_SAVE_OPTIONS = {"format": "PNG", "optimize": False, "compress_level": 1}
+
+
+class _RenderState:
+    """QR encoder, canvas and text sizes reused between the labels of one batch."""
+
+    def __init__(self):
+        self.qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_H,
+            box_size=10,
+            border=4,
+        )
+        self.canvas = None
+        self.draw = None
+        self.text_sizes = {}
+
 
 class QRCodeGenerator:
+    """
+    Renders QR labels with a title and part number.
+    generate() keeps no state between calls, so one generator can be shared by
+    several threads. generate_many() reuses its encoder and canvas only for the
+    duration of that call.
+    """
+
+    EXTRA_HEIGHT = 100  # space for title + part number
+
     def __init__(self, font_path: str = "arial.ttf", font_size: int = 24):
         self.font_path = font_path
         self.font_size = font_size
+        # Loaded once - loading the font hits disk; it is only read while drawing
+        self._font = self._load_font()
 
     def _load_font(self):
         try:
@@ -23,56 +56,114 @@ class QRCodeGenerator:
         except AttributeError:
             return draw.textsize(text, font=font)
 
-    def generate(
-        self,
-        data: str,
-        title: str = "",
-        part_number: str = "",
-        output_file: str = "qrcode_with_text.png",
-    ):
+    def _text_size(self, state, text):
+        """Measured text size, cached for the batch (titles repeat across it)."""
+        size = state.text_sizes.get(text)
+        if size is None:
+            size = state.text_sizes[text] = self._get_text_size(state.draw, text, self._font)
+        return size
+
+    def _get_canvas(self, state, width, height):
+        """Return a blank white canvas, reusing the batch's previous one when the size matches."""
+        if state.canvas is None or state.canvas.size != (width, height):
+            state.canvas = Image.new("RGB", (width, height), "white")
+            state.draw = ImageDraw.Draw(state.canvas)
+        else:
+            state.canvas.paste("white", (0, 0, width, height))
+        return state.canvas
+
+    def _render(self, state, data: str, title: str = "", part_number: str = ""):
+        """Draw the labelled QR code onto the state's canvas and return it."""
         # ----------------------
         # Generate QR code
         # ----------------------
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
-        )
+        qr = state.qr
+        qr.clear()
+        qr.version = 1  # make(fit=True) only grows the version, start small again
         qr.add_data(data)
         qr.make(fit=True)
 
-        qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+        # Module matrix (border included) -> mask of dark pixels, upscaled by box_size.
+        # Black is filled through the mask onto the white canvas, so no QR image
+        # (1-bit, grayscale or RGB) is ever built and converted
+        modules = np.asarray(qr.get_matrix(), dtype=bool)
+        dark = np.where(modules, np.uint8(255), np.uint8(0))
+        dark = dark.repeat(qr.box_size, axis=0).repeat(qr.box_size, axis=1)
+        qr_size = dark.shape[1]
 
         # ----------------------
         # Add Title and Part Number
         # ----------------------
-        extra_height = 100
-        new_img = Image.new("RGB", (qr_img.width, qr_img.height + extra_height), "white")
-        new_img.paste(qr_img, (0, extra_height))
+        extra_height = self.EXTRA_HEIGHT
+        new_img = self._get_canvas(state, qr_size, qr_size + extra_height)
+        new_img.paste((0, 0, 0), (0, extra_height), mask=Image.fromarray(dark))
 
-        draw = ImageDraw.Draw(new_img)
-        font = self._load_font()
+        draw = state.draw
+        font = self._font
 
         if title:
-            title_w, title_h = self._get_text_size(draw, title, font)
-            draw.text(((qr_img.width - title_w) // 2, 5), title, font=font, fill="black")
+            title_w, title_h = self._text_size(state, title)
+            draw.text(((qr_size - title_w) // 2, 5), title, font=font, fill="black")
 
         if part_number:
-            part_w, part_h = self._get_text_size(draw, part_number, font)
+            part_w, part_h = self._text_size(state, part_number)
             draw.text(
-                ((qr_img.width - part_w) // 2, extra_height - part_h - 5),
+                ((qr_size - part_w) // 2, extra_height - part_h - 5),
                 part_number,
                 font=font,
                 fill="black",
             )
 
+        return new_img
+
+    def generate(
+        self,
+        data: str,
+        title: str = "",
+        part_number: str = "",
+        output_file: str = "qrcode_with_text.png",
+    ):
+        new_img = self._render(_RenderState(), data, title, part_number)
+
         # ----------------------
         # Save final image
         # ----------------------
-        new_img.save(output_file)
+        new_img.save(output_file, **PNG_SAVE_OPTIONS)
         return output_file
-    
+
+    def generate_many(self, items, workers: int = 4):
+        """
+        Generate a batch of labels, reusing the font, QR encoder and canvas.
+        - items: iterable of dicts with generate() keyword arguments;
+          each needs its own output_file (files are written concurrently)
+        - workers: threads encoding/writing PNGs while the next label is rendered
+        Returns the list of written file paths.
+        """
+        # One state per call: the text-size cache only lives as long as the batch
+        state = _RenderState()
+        files = []
+        seen = set()
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for item in items:
+                item = dict(item)
+                output_file = item.pop("output_file", None)
+                if output_file is None:
+                    raise ValueError(f"generate_many item needs an output_file: {item!r}")
+                if output_file in seen:
+                    raise ValueError(f"Duplicate output_file in generate_many: {output_file}")
+                seen.add(output_file)
+                # The canvas is redrawn for the next item, hand the writer its own copy
+                img = self._render(state, **item).copy()
+                pending.append(ex.submit(img.save, output_file, **PNG_SAVE_OPTIONS))
+                files.append(output_file)
+                # Bound the images held in memory by the write queue
+                if len(pending) > 2 * workers:
+                    pending.popleft().result()
+            for future in pending:
+                future.result()
+        return files
+
 # ✅ Usage in another script
 # from qrcode_generator import QRCodeGenerator
 
@@ -85,3 +176,7 @@ class QRCodeGenerator:
 # )
 
 # print(f"QR code saved at {file_path}")
+
+# files = generator.generate_many(
+#     {"data": sku, "title": "BIN LABEL", "output_file": f"{sku}.png"} for sku in skus
+# )
@@ -2,19 +2,23 @@ import serial
 import time
 import re
 
-def parse_weight(raw: str):
-    # Strip control chars like STX/ETX
-    cleaned = ''.join(ch for ch in raw if ch.isprintable())
+# First decimal number in a raw scale line (STX/ETX and other control bytes are skipped)
+WEIGHT_RE = re.compile(rb"[-+]?\d+\.\d+")
+
+def parse_weight(raw: bytes):
+    # Unstable reading ("US" header, possibly after STX) - nothing to parse
+    if b"US" in raw[:4]:
+        return None
 
     # Debug
-    # print(f"raw: {repr(raw)} | cleaned: {repr(cleaned)}")
+    # print(f"raw: {repr(raw)}")
 
     # Extract number with regex
-    match = re.search(r"[-+]?\d+\.\d+", cleaned)
+    match = WEIGHT_RE.search(raw)
     if match:
         return float(match.group())
     else:
-        print(f"Parse error: {repr(cleaned)}")
+        print(f"Parse error: {raw!r}")
         return None
 
 # ---- Config ----
@@ -22,6 +26,7 @@ PORT = "/dev/ttyUSB0"  # or "COM3" on Windows
 BAUD = 9600
 STABLE_SECONDS = 5      # how long to wait before confirming stability
 TOLERANCE = 0.001        # small fluctuations ignored (kg)
+STABLE_NS = STABLE_SECONDS * 1_000_000_000
 
 ser = serial.Serial(
     port=PORT,
@@ -37,28 +42,34 @@ print(f"Listening on {ser.port} ...")
 last_weight = None
 stable_start_time = None
 stable_reported = False
+buf = bytearray()  # bytes received but not yet split into lines
 
 try:
     while True:
-        line = ser.readline().decode(errors="ignore").strip()
+        idx = buf.find(b"\n")
+        if idx < 0:
+            buf += ser.read(ser.in_waiting or 1)
+            continue
+        line = bytes(buf[:idx]).strip()
+        del buf[:idx + 1]
         if line:
             # print(line)
             weight = parse_weight(line)
             if weight is not None:
+                now = time.monotonic_ns()
                 # print(f"Weight: {weight}")
                 if last_weight is None or abs(weight - last_weight) > TOLERANCE:
                     # weight changed significantly → reset stability tracking
                     print(f"Weight changed → {weight} kg")
                     last_weight = weight
-                    stable_start_time = time.time()
+                    stable_start_time = now
                     stable_reported = False
                 else:
                     # weight is within tolerance → candidate for stability
                     if stable_start_time is None:
-                        stable_start_time = time.time()
+                        stable_start_time = now
 
-                    elapsed = time.time() - stable_start_time
-                    if elapsed >= STABLE_SECONDS and not stable_reported:
+                    if now - stable_start_time >= STABLE_NS and not stable_reported:
                         print(f"Weight stable for {STABLE_SECONDS}s → {weight} kg")
                         stable_reported = True
 
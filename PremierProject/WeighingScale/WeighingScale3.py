@@ -1,10 +1,40 @@
 # scale_reader.py
+import asyncio
 import serial
 import time
 import re
 
+# First decimal number in a raw scale line (STX/ETX and other control bytes are skipped)
+_WEIGHT_RE = re.compile(rb"[-+]?\d+\.\d+")
+
+
+class FixedFrameParser:
+    def __init__(self, frame_size, weight_slice, terminator=b"\r\n"):
+        """
+        Parser for scales that send fixed-width records, e.g. "ST,GS,+  123.456 kg\\r\\n"
+        is FixedFrameParser(frame_size=21, weight_slice=slice(6, 16)).
+        :param frame_size: Bytes per record, including the terminator
+        :param weight_slice: Byte range of the weight field within a record
+        :param terminator: Bytes every record ends with, used to resync on partial frames
+        """
+        self.frame_size = frame_size
+        self.weight_slice = weight_slice
+        self.terminator = terminator
+
+    def parse(self, frame: bytes):
+        """
+        Extract numeric weight from one complete record.
+        """
+        try:
+            # Sign may be padded away from the digits ("+  123.456")
+            return float(frame[self.weight_slice].replace(b" ", b""))
+        except ValueError:
+            print(f"Parse error: {frame!r}")
+            return None
+
+
 class SerialScale:
-    def __init__(self, port="/dev/ttyUSB0", baud=9600, stable_seconds=2, tolerance=0.001, timeout=1, stable_callback=None):
+    def __init__(self, port="/dev/ttyUSB0", baud=9600, stable_seconds=2, tolerance=0.001, timeout=1, stable_callback=None, parser=None):
         """
         Initialize the serial scale.
         :param port: Serial port (e.g., "/dev/ttyUSB0" or "COM3")
@@ -13,6 +43,7 @@ class SerialScale:
         :param tolerance: Minimum change to consider weight changed
         :param timeout: Serial read timeout in seconds
         :param stable_callback: Function to call when weight stabilizes
+        :param parser: Optional FixedFrameParser for fixed-width protocols (default: line + regex)
         """
         self.port = port
         self.baud = baud
@@ -20,6 +51,8 @@ class SerialScale:
         self.tolerance = tolerance
         self.timeout = timeout
         self.stable_callback = stable_callback
+        self.parser = parser
+        self._stable_ns = int(self.stable_seconds * 1_000_000_000)
 
         self.ser = serial.Serial(
             port=self.port,
@@ -33,62 +66,147 @@ class SerialScale:
         self.last_weight = None
         self.stable_start_time = None
         self.stable_reported = False
+        self._buf = bytearray()  # bytes received but not yet split into lines
 
         print(f"Listening on {self.ser.port} ...")
 
     @staticmethod
-    def parse_weight(raw: str):
+    def parse_weight(raw: bytes):
         """
-        Extract numeric weight from raw string.
+        Extract numeric weight from a raw serial line.
+        Unstable ("US" header) readings are skipped without parsing.
         """
-        cleaned = ''.join(ch for ch in raw if ch.isprintable())
-        match = re.search(r"[-+]?\d+\.\d+", cleaned)
+        if b"US" in raw[:4]:  # header, possibly after an STX byte
+            return None
+        match = _WEIGHT_RE.search(raw)
         if match:
             return float(match.group())
         else:
-            print(f"Parse error: {repr(cleaned)}")
+            print(f"Parse error: {raw!r}")
             return None
 
     def read_weight(self):
         """
         Read a line from serial and parse weight.
+        Returns None while no complete line has arrived yet.
         """
-        line = self.ser.readline().decode(errors="ignore").strip()
+        if self.parser is not None:
+            return self._read_frame()
+        buf = self._buf
+        idx = buf.find(b"\n")
+        if idx < 0:
+            # Pull everything already waiting in one read, block for at most one byte
+            buf += self.ser.read(self.ser.in_waiting or 1)
+            idx = buf.find(b"\n")
+            if idx < 0:
+                return None
+        line = bytes(buf[:idx]).strip()
+        del buf[:idx + 1]
         if not line:
             return None
         return self.parse_weight(line)
 
+    def _read_frame(self):
+        """
+        Read one fixed-width record and parse it with self.parser.
+        """
+        parser = self.parser
+        buf = self._buf
+        buf += self.ser.read(parser.frame_size - len(buf))
+        if len(buf) < parser.frame_size:
+            return None
+        if not buf.endswith(parser.terminator):
+            # Out of step with the frames - drop everything up to the next terminator,
+            # or keep a possible partial terminator at the end if there is none
+            term_len = len(parser.terminator)
+            idx = buf.find(parser.terminator)
+            del buf[:idx + term_len if idx >= 0 else len(buf) - (term_len - 1)]
+            return None
+        frame = bytes(buf)
+        buf.clear()
+        return parser.parse(frame)
+
+    def _update_stability(self, weight):
+        """
+        Track a new reading and call stable_callback once it has held for stable_seconds.
+        """
+        now = time.monotonic_ns()
+
+        # Weight changed
+        if self.last_weight is None or abs(weight - self.last_weight) > self.tolerance:
+            self.last_weight = weight
+            self.stable_start_time = now
+            self.stable_reported = False
+        else:
+            # Candidate for stability
+            if self.stable_start_time is None:
+                self.stable_start_time = now
+
+            if now - self.stable_start_time >= self._stable_ns and not self.stable_reported:
+                self.stable_reported = True
+                if self.stable_callback:
+                    self.stable_callback(weight)
+
     def monitor(self):
         """
         Continuously monitor the scale and call stable_callback when weight stabilizes.
         """
+        # Loop-invariant attributes as locals
+        read_weight = self.read_weight
+        update_stability = self._update_stability
+        tolerance = self.tolerance
         try:
             while True:
-                weight = self.read_weight()
+                weight = read_weight()
                 if weight is None:
                     continue
 
-                # Weight changed
-                if self.last_weight is None or abs(weight - self.last_weight) > self.tolerance:
-                    self.last_weight = weight
-                    self.stable_start_time = time.time()
-                    self.stable_reported = False
-                else:
-                    # Candidate for stability
-                    if self.stable_start_time is None:
-                        self.stable_start_time = time.time()
-
-                    elapsed = time.time() - self.stable_start_time
-                    if elapsed >= self.stable_seconds and not self.stable_reported:
-                        self.stable_reported = True
-                        if self.stable_callback:
-                            self.stable_callback(weight)
+                # Idle fast path: already reported and weight unchanged
+                if self.stable_reported and abs(weight - self.last_weight) <= tolerance:
+                    continue
+
+                update_stability(weight)
 
         except KeyboardInterrupt:
             print("Stopped by user")
         finally:
             self.ser.close()
 
+    def _has_pending(self):
+        """
+        True while read_weight can make progress without waiting on the port.
+        """
+        if self.ser.in_waiting:
+            return True
+        return self.parser is None and b"\n" in self._buf
+
+    async def monitor_async(self):
+        """
+        monitor() for an asyncio event loop (POSIX only): waits for the port to become
+        readable instead of blocking a thread, so it can share a loop with other devices.
+        """
+        loop = asyncio.get_running_loop()
+        readable = asyncio.Event()
+        fd = self.ser.fileno()
+        # Non-blocking reads - the event loop does the waiting
+        self.ser.timeout = 0
+        loop.add_reader(fd, readable.set)
+        tolerance = self.tolerance
+        try:
+            while True:
+                await readable.wait()
+                readable.clear()
+                while self._has_pending():
+                    weight = self.read_weight()
+                    if weight is None:
+                        continue
+                    if self.stable_reported and abs(weight - self.last_weight) <= tolerance:
+                        continue
+                    self._update_stability(weight)
+        finally:
+            loop.remove_reader(fd)
+            self.ser.close()
+
 
 if __name__ == "__main__":
     # Example callback
@@ -96,4 +214,7 @@ if __name__ == "__main__":
         print(f"Stable weight detected: {weight} kg")
 
     scale = SerialScale(port="/dev/ttyUSB0", stable_seconds=2, stable_callback=on_stable)
+    # Known fixed-width protocol: skip the regex and slice the weight field directly
+    # scale = SerialScale(port="/dev/ttyUSB0", stable_seconds=2, stable_callback=on_stable,
+    #                     parser=FixedFrameParser(frame_size=21, weight_slice=slice(6, 16)))
     scale.monitor()